@@ -25,55 +25,55 @@ activities = {
         "description": "Learn strategies and compete in chess tournaments",
         "schedule": "Fridays, 3:30 PM - 5:00 PM",
         "max_participants": 12,
-        "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
+        "participants": {"michael@mergington.edu", "daniel@mergington.edu"}
     },
     "Programming Class": {
         "description": "Learn programming fundamentals and build software projects",
         "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
         "max_participants": 20,
-        "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
+        "participants": {"emma@mergington.edu", "sophia@mergington.edu"}
     },
     "Gym Class": {
         "description": "Physical education and sports activities",
         "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
         "max_participants": 30,
-        "participants": ["john@mergington.edu", "olivia@mergington.edu"]
+        "participants": {"john@mergington.edu", "olivia@mergington.edu"}
     },
     "Basketball Team": {
         "description": "Competitive basketball team for intramural and regional tournaments",
         "schedule": "Mondays and Wednesdays, 4:00 PM - 5:30 PM",
         "max_participants": 15,
-        "participants": ["alex@mergington.edu"]
+        "participants": {"alex@mergington.edu"}
     },
     "Tennis Club": {
         "description": "Learn tennis skills and compete in matches",
         "schedule": "Tuesdays and Thursdays, 3:30 PM - 5:00 PM",
         "max_participants": 16,
-        "participants": ["lucas@mergington.edu", "grace@mergington.edu"]
+        "participants": {"lucas@mergington.edu", "grace@mergington.edu"}
     },
     "Art Studio": {
         "description": "Explore painting, drawing, and mixed media techniques",
         "schedule": "Wednesdays, 3:30 PM - 5:00 PM",
         "max_participants": 18,
-        "participants": ["isabella@mergington.edu"]
+        "participants": {"isabella@mergington.edu"}
     },
     "Music Band": {
         "description": "Play instruments and perform in school concerts",
         "schedule": "Thursdays, 3:30 PM - 4:30 PM",
         "max_participants": 25,
-        "participants": ["james@mergington.edu", "mia@mergington.edu"]
+        "participants": {"james@mergington.edu", "mia@mergington.edu"}
     },
     "Debate Team": {
         "description": "Develop argumentation and public speaking skills",
         "schedule": "Mondays and Fridays, 3:30 PM - 4:30 PM",
         "max_participants": 12,
-        "participants": ["noah@mergington.edu"]
+        "participants": {"noah@mergington.edu"}
     },
     "Science Club": {
         "description": "Conduct experiments and explore scientific concepts",
         "schedule": "Tuesdays, 3:30 PM - 5:00 PM",
         "max_participants": 20,
-        "participants": ["ava@mergington.edu", "liam@mergington.edu"]
+        "participants": {"ava@mergington.edu", "liam@mergington.edu"}
     }
 }
 
@@ -85,7 +85,12 @@ def root():
 
 @app.get("/activities")
 def get_activities():
-    return activities
+    # Participants are stored as sets for O(1) membership checks; serialize
+    # them as sorted lists so the JSON output stays stable
+    return {
+        name: {**details, "participants": sorted(details["participants"])}
+        for name, details in activities.items()
+    }
 
 
 @app.post("/activities/{activity_name}/signup")
@@ -103,7 +108,7 @@ def signup_for_activity(activity_name: str, email: str):
         raise HTTPException(status_code=400, detail="Student already signed up for this activity")
     
     # Add student
-    activity["participants"].append(email)
+    activity["participants"].add(email)
     return {"message": f"Signed up {email} for {activity_name}"}
 
 
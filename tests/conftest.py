@@ -0,0 +1,78 @@
+"""
+Shared pytest fixtures and configuration for the test suite.
+
+The ``src`` directory is put on the import path via ``pythonpath`` in
+pytest.ini, so ``app`` imports without any per-module sys.path surgery.
+
+The app keeps its state in a process-global ``activities`` dict. Under
+pytest-xdist each worker is a separate process with its own copy of that
+dict, so no cross-worker locking is needed; tests that mutate it are
+pinned to a single worker via ``pytest.mark.xdist_group`` so they can
+safely share the in-process state. Run with::
+
+    pytest -n auto --dist=loadgroup
+"""
+
+import pickle
+
+import pytest
+import pytest_asyncio
+from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+
+from app import app, activities
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Create a single test client shared by the whole suite.
+
+    Constructing a TestClient is the most expensive piece of per-test setup,
+    and no test mutates client state (only the activities dict, which
+    reset_activities handles), so one session-scoped client is safe. The
+    context manager runs the app lifespan exactly once.
+    """
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest_asyncio.fixture(loop_scope="session", scope="session")
+async def async_client():
+    """Create a single async client for tests that fan out concurrent requests.
+
+    Talks to the app through an in-process ASGI transport, so concurrent
+    requests can overlap on the event loop without a real server.
+    """
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def pristine_activities(client):
+    """Fetch and decode GET /activities against unmutated state once.
+
+    Mutating tests always restore state on teardown, so whenever this first
+    runs the payload reflects the pristine seed data. Read-only tests share
+    the parsed dict instead of each issuing their own GET.
+    """
+    return client.get("/activities").json()
+
+
+# Pristine participants snapshot, pickled once at import time. Tests only
+# ever mutate the participants sets, so nothing else needs snapshotting, and
+# pickle.loads rebuilds fresh sets in C instead of re-running Python
+# comprehensions on every restore.
+_BASELINE_BLOB = pickle.dumps(
+    {name: details["participants"] for name, details in activities.items()},
+    protocol=5,
+)
+
+
+@pytest.fixture
+def reset_activities():
+    """Restore the participants sets to their pristine state after each test"""
+    yield
+
+    for name, participants in pickle.loads(_BASELINE_BLOB).items():
+        activities[name]["participants"] = participants
@@ -2,47 +2,46 @@
 Tests for the Mergington High School API
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
-from fastapi.testclient import TestClient
-import sys
-from pathlib import Path
-
-# Add src directory to path so we can import app
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
-from app import app, activities
-
-
-@pytest.fixture
-def client():
-    """Create a test client for the FastAPI app"""
-    return TestClient(app)
-
-
-@pytest.fixture
-def reset_activities():
-    """Reset activities to initial state before each test"""
-    # Store original state
-    original_activities = {
-        name: {
-            "description": details["description"],
-            "schedule": details["schedule"],
-            "max_participants": details["max_participants"],
-            "participants": details["participants"].copy()
-        }
-        for name, details in activities.items()
-    }
-    
-    yield
-    
-    # Restore original state after test
-    activities.clear()
-    activities.update(original_activities)
+
+from app import activities
+
+# Pre-encoded paths for the Chess Club endpoints used across most tests; the
+# space in the activity name would otherwise be percent-encoded per request
+CHESS_SIGNUP = "/activities/Chess%20Club/signup"
+CHESS_UNREGISTER = "/activities/Chess%20Club/participants/"
+
+# Fields every activity must expose in the /activities payload
+REQUIRED_FIELDS = frozenset({"description", "schedule", "max_participants", "participants"})
+
+# Students used by the bulk-signup tests; a tuple so the constant is built
+# once at import rather than per test call
+_BULK_STUDENTS = (
+    "student1@mergington.edu",
+    "student2@mergington.edu",
+    "student3@mergington.edu",
+)
+
+
+def assert_ok_contains(response, *fragments):
+    """Assert a successful response whose raw body contains every fragment.
+
+    Searching response.text skips the JSON decode and collapses the usual
+    multi-line status/body assertion blocks into a single call.
+    """
+    response.raise_for_status()
+    body = response.text
+    for fragment in fragments:
+        assert fragment in body, body
 
 
 class TestGetActivities:
     """Test the GET /activities endpoint"""
     
+    @pytest.mark.readonly
     def test_get_activities(self, client):
         """Test retrieving all activities"""
         response = client.get("/activities")
@@ -53,136 +52,107 @@ class TestGetActivities:
         assert "Programming Class" in data
         assert data["Chess Club"]["description"] == "Learn strategies and compete in chess tournaments"
     
-    def test_activities_have_required_fields(self, client):
+    @pytest.mark.readonly
+    def test_activities_have_required_fields(self, pristine_activities):
         """Test that activities have all required fields"""
-        response = client.get("/activities")
-        data = response.json()
-        
-        for activity_name, activity_data in data.items():
-            assert "description" in activity_data
-            assert "schedule" in activity_data
-            assert "max_participants" in activity_data
-            assert "participants" in activity_data
-            assert isinstance(activity_data["participants"], list)
+        assert all(
+            REQUIRED_FIELDS <= activity_data.keys()
+            and isinstance(activity_data["participants"], list)
+            for activity_data in pristine_activities.values()
+        )
 
 
 class TestSignup:
     """Test the POST /activities/{activity_name}/signup endpoint"""
     
+    @pytest.mark.xdist_group(name="activities_state")
     def test_signup_success(self, client, reset_activities):
         """Test successful signup for an activity"""
         response = client.post(
-            "/activities/Chess Club/signup?email=newstudent@mergington.edu"
+            CHESS_SIGNUP, params={"email": "newstudent@mergington.edu"}
         )
-        assert response.status_code == 200
-        data = response.json()
-        assert "message" in data
-        assert "Signed up" in data["message"]
-        assert "newstudent@mergington.edu" in data["message"]
+        assert_ok_contains(response, "Signed up", "newstudent@mergington.edu")
         
-        # Verify participant was added
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert "newstudent@mergington.edu" in activities_data["Chess Club"]["participants"]
+        # Verify participant was added (read app state directly; the HTTP
+        # surface is covered by TestGetActivities)
+        assert "newstudent@mergington.edu" in activities["Chess Club"]["participants"]
     
-    def test_signup_nonexistent_activity(self, client):
-        """Test signup for a non-existent activity"""
+    @pytest.mark.readonly
+    @pytest.mark.parametrize("activity,email,status,fragment", [
+        ("Nonexistent Club", "student@mergington.edu", 404, "Activity not found"),
+        # michael@mergington.edu is already in Chess Club
+        ("Chess Club", "michael@mergington.edu", 400, "already signed up"),
+    ])
+    def test_signup_errors(self, client, activity, email, status, fragment):
+        """Test signup error responses for bad activities and duplicates"""
         response = client.post(
-            "/activities/Nonexistent Club/signup?email=student@mergington.edu"
+            f"/activities/{activity}/signup", params={"email": email}
         )
-        assert response.status_code == 404
-        data = response.json()
-        assert "Activity not found" in data["detail"]
-    
+        assert response.status_code == status
+        assert fragment in response.text
+
+    @pytest.mark.xdist_group(name="activities_state")
     def test_signup_duplicate(self, client, reset_activities):
         """Test that a student cannot sign up twice for the same activity"""
         # First signup
         response1 = client.post(
-            "/activities/Chess Club/signup?email=duplicate@mergington.edu"
+            CHESS_SIGNUP, params={"email": "duplicate@mergington.edu"}
         )
         assert response1.status_code == 200
         
         # Second signup (should fail)
         response2 = client.post(
-            "/activities/Chess Club/signup?email=duplicate@mergington.edu"
+            CHESS_SIGNUP, params={"email": "duplicate@mergington.edu"}
         )
         assert response2.status_code == 400
-        data = response2.json()
-        assert "already signed up" in data["detail"]
-    
-    def test_signup_already_registered(self, client):
-        """Test signup for someone already registered in an activity"""
-        # michael@mergington.edu is already in Chess Club
-        response = client.post(
-            "/activities/Chess Club/signup?email=michael@mergington.edu"
-        )
-        assert response.status_code == 400
-        data = response.json()
-        assert "already signed up" in data["detail"]
+        assert "already signed up" in response2.text
 
 
 class TestUnregister:
     """Test the DELETE /activities/{activity_name}/participants/{email} endpoint"""
     
+    @pytest.mark.xdist_group(name="activities_state")
     def test_unregister_success(self, client, reset_activities):
         """Test successful unregistration of a participant"""
         # michael@mergington.edu is in Chess Club initially
-        initial_response = client.get("/activities")
-        initial_data = initial_response.json()
-        initial_count = len(initial_data["Chess Club"]["participants"])
-        
+        initial_count = len(activities["Chess Club"]["participants"])
+
         # Unregister
-        response = client.delete(
-            "/activities/Chess Club/participants/michael@mergington.edu"
-        )
-        assert response.status_code == 200
-        data = response.json()
-        assert "Unregistered" in data["message"]
-        
+        response = client.delete(CHESS_UNREGISTER + "michael@mergington.edu")
+        assert_ok_contains(response, "Unregistered")
+
         # Verify participant was removed
-        final_response = client.get("/activities")
-        final_data = final_response.json()
-        assert len(final_data["Chess Club"]["participants"]) == initial_count - 1
-        assert "michael@mergington.edu" not in final_data["Chess Club"]["participants"]
-    
-    def test_unregister_nonexistent_activity(self, client):
-        """Test unregistration from a non-existent activity"""
-        response = client.delete(
-            "/activities/Nonexistent Club/participants/student@mergington.edu"
-        )
-        assert response.status_code == 404
-        data = response.json()
-        assert "Activity not found" in data["detail"]
-    
-    def test_unregister_nonexistent_participant(self, client, reset_activities):
-        """Test unregistration of a participant not in the activity"""
-        response = client.delete(
-            "/activities/Chess Club/participants/notregistered@mergington.edu"
-        )
-        assert response.status_code == 400
-        data = response.json()
-        assert "Participant not found" in data["detail"]
+        assert len(activities["Chess Club"]["participants"]) == initial_count - 1
+        assert "michael@mergington.edu" not in activities["Chess Club"]["participants"]
     
+    @pytest.mark.readonly
+    @pytest.mark.parametrize("activity,email,status,fragment", [
+        ("Nonexistent Club", "student@mergington.edu", 404, "Activity not found"),
+        ("Chess Club", "notregistered@mergington.edu", 400, "Participant not found"),
+    ])
+    def test_unregister_errors(self, client, activity, email, status, fragment):
+        """Test unregister error responses for bad activities and participants"""
+        response = client.delete(f"/activities/{activity}/participants/{email}")
+        assert response.status_code == status
+        assert fragment in response.text
+
+    @pytest.mark.xdist_group(name="activities_state")
     def test_unregister_twice(self, client, reset_activities):
         """Test that you cannot unregister someone twice"""
         # First unregister (should succeed)
-        response1 = client.delete(
-            "/activities/Chess Club/participants/michael@mergington.edu"
-        )
+        response1 = client.delete(CHESS_UNREGISTER + "michael@mergington.edu")
         assert response1.status_code == 200
         
         # Second unregister (should fail)
-        response2 = client.delete(
-            "/activities/Chess Club/participants/michael@mergington.edu"
-        )
+        response2 = client.delete(CHESS_UNREGISTER + "michael@mergington.edu")
         assert response2.status_code == 400
-        data = response2.json()
-        assert "Participant not found" in data["detail"]
+        assert "Participant not found" in response2.text
 
 
 class TestIntegration:
     """Integration tests combining multiple operations"""
     
+    @pytest.mark.xdist_group(name="activities_state")
     def test_signup_unregister_signup_flow(self, client, reset_activities):
         """Test the flow of signup -> unregister -> signup again"""
         email = "integration@mergington.edu"
@@ -191,39 +161,59 @@ class TestIntegration:
         # Sign up
         response1 = client.post(f"/activities/{activity}/signup?email={email}")
         assert response1.status_code == 200
-        
-        activities_response = client.get("/activities")
-        assert email in activities_response.json()[activity]["participants"]
-        
+        assert email in activities[activity]["participants"]
+
         # Unregister
         response2 = client.delete(f"/activities/{activity}/participants/{email}")
         assert response2.status_code == 200
-        
-        activities_response = client.get("/activities")
-        assert email not in activities_response.json()[activity]["participants"]
-        
+        assert email not in activities[activity]["participants"]
+
         # Sign up again
         response3 = client.post(f"/activities/{activity}/signup?email={email}")
         assert response3.status_code == 200
-        
+
+        # One final GET to confirm the HTTP surface reflects the state
         activities_response = client.get("/activities")
         assert email in activities_response.json()[activity]["participants"]
     
+    @pytest.mark.xdist_group(name="activities_state")
     def test_multiple_signups(self, client, reset_activities):
         """Test signing up multiple students for the same activity"""
         activity = "Art Studio"
-        students = [
-            "student1@mergington.edu",
-            "student2@mergington.edu",
-            "student3@mergington.edu"
-        ]
-        
-        for student in students:
-            response = client.post(f"/activities/{activity}/signup?email={student}")
-            assert response.status_code == 200
-        
+
+        # Issue the independent signups from a thread pool; on free-threaded
+        # builds they run truly in parallel, elsewhere they still overlap
+        # scheduling inside the ASGI transport
+        with ThreadPoolExecutor(max_workers=len(_BULK_STUDENTS)) as executor:
+            responses = list(executor.map(
+                lambda student: client.post(
+                    f"/activities/{activity}/signup", params={"email": student}
+                ),
+                _BULK_STUDENTS,
+            ))
+        assert all(response.status_code == 200 for response in responses)
+
         # Verify all are registered
         activities_response = client.get("/activities")
         participants = activities_response.json()[activity]["participants"]
-        for student in students:
+        for student in _BULK_STUDENTS:
             assert student in participants
+
+    @pytest.mark.asyncio(loop_scope="session")
+    @pytest.mark.xdist_group(name="activities_state")
+    async def test_multiple_signups_concurrent(self, async_client, reset_activities):
+        """Test that independent signups can be issued concurrently"""
+        activity = "Art Studio"
+        students = [
+            "async1@mergington.edu",
+            "async2@mergington.edu",
+            "async3@mergington.edu"
+        ]
+
+        responses = await asyncio.gather(
+            *(async_client.post(f"/activities/{activity}/signup?email={student}")
+              for student in students)
+        )
+
+        assert all(response.status_code == 200 for response in responses)
+        assert set(students) <= activities[activity]["participants"]